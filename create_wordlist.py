@@ -9,19 +9,26 @@ url = "https://raw.githubusercontent.com/kkrypt0nn/wordlists/refs/heads/main/wor
 # just the 5 letter words, all lowercase
 # no punctuation, no numbers, no special characters (like _)
 
+import re
+
 import requests
 
+# One scan over the raw bytes instead of per-line string method calls
+# (\r? keeps CRLF files working, like splitlines() did)
+FIVE_LETTER_WORD_RE = re.compile(rb"^([a-z]{5})\r?$", re.MULTILINE)
+
+# Reuse one keep-alive connection pool for any requests made by this script
+session = requests.Session()
+
 # Fetch the wordlist from the URL
-response = requests.get(url)
+response = session.get(url, timeout=10)
 if response.status_code == 200:
-    words = response.text.splitlines()
-
     # Filter for 5-letter words, all lowercase, no punctuation, numbers, or special characters
-    wordlist = [word for word in words if len(word) == 5 and word.isalpha() and word.islower()]
+    wordlist = FIVE_LETTER_WORD_RE.findall(response.content)
 
     # Save the filtered wordlist to a file
-    with open("wordlist.txt", "w") as file:
-        file.write("\n".join(wordlist))
+    with open("wordlist.txt", "wb") as file:
+        file.write(b"\n".join(wordlist))
 
     print(f"Wordlist created with {len(wordlist)} words.")
 else:
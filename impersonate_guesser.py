@@ -1,10 +1,28 @@
 import random
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple
 
+import numpy as np
+from numba import njit, prange
+
 # --- Constants ---
 WORDLIST_FILE = "wordlist.txt"
 NUM_CANDIDATES = 100
 
+# Feedback codes (int8)
+GREY = 0
+YELLOW = 1
+GREEN = 2
+
+# Column order of the details array returned by score_candidates
+DETAIL_KEYS = (
+    "valid_for_n_games",
+    "total_new_letters",
+    "total_reused_grey",
+    "total_reused_yellow",
+    "total_reused_green",
+)
+
 def load_wordlist() -> List[str]:
     """Loads the 5-letter wordlist from a file."""
     try:
@@ -15,6 +33,33 @@ def load_wordlist() -> List[str]:
         print(f"Error: '{WORDLIST_FILE}' not found. Please create it.")
         return []
 
+def word_to_mask(word: str) -> int:
+    """Encodes the letters of a word as a 26-bit mask (bit 0 = 'a', bit 25 = 'z')."""
+    mask = 0
+    for letter in word:
+        mask |= 1 << (ord(letter) - 97)
+    return mask
+
+def letters_to_mask(letters) -> np.uint32:
+    """Encodes a collection of letters as a single uint32 mask."""
+    return np.uint32(word_to_mask(letters))
+
+def encode_wordlist(wordlist: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encodes a list of words for vectorized scoring.
+
+    Returns:
+    - masks: uint32 array of shape (N,), the letter bitmask of each word.
+    - positions: uint8 array of shape (N, 5), the letter index (0-25) at each position.
+    """
+    masks = np.fromiter((word_to_mask(w) for w in wordlist), dtype=np.uint32, count=len(wordlist))
+    positions = np.frombuffer("".join(wordlist).encode("ascii"), dtype=np.uint8).reshape(-1, 5) - 97
+    return masks, positions
+
+# Loaded and encoded once at import, then sliced by candidate index every turn
+_WORDS = load_wordlist()
+WORD_MASKS, WORD_BYTES = encode_wordlist(_WORDS)
+
 def extract_game_knowledge(game: Dict[str, Any]) -> Dict[str, Any]:
     """
     Extracts all known letter information from a single game's state.
@@ -23,55 +68,198 @@ def extract_game_knowledge(game: Dict[str, Any]) -> Dict[str, Any]:
     - 'grey_letters': set of letters known to be incorrect.
     - 'yellow_letters': set of letters known to be in the word but in the wrong position.
     - 'green_letters': dict mapping correct letters to a set of their known positions.
+    - 'green_keys': set of the green letters (the keys of 'green_letters').
     - 'all_known_letters': a combined set of all letters seen so far.
+    - 'grey_mask', 'yellow_mask', 'green_key_mask', 'all_known_mask': the same
+      letter sets encoded as uint32 bitmasks.
+
+    Results are cached by the game's guess/feedback history, so the returned
+    dictionary is shared and must not be modified.
     """
+    guesses = tuple(game.get("guesses", []))
+    # The codes as int8 bytes are a cheap hashable key, and indexing them yields the codes;
+    # the cast keeps the key one byte per code whatever the feedback's dtype
+    feedback_history = tuple(np.asarray(feedback, dtype=np.int8).tobytes() for feedback in game.get("feedback", []))
+    return _extract_game_knowledge(guesses, feedback_history)
+
+@lru_cache(maxsize=4096)
+def _extract_game_knowledge(guesses: Tuple[str, ...], feedback_history: Tuple[bytes, ...]) -> Dict[str, Any]:
+    """Cached body of extract_game_knowledge, keyed by the hashable game history."""
     knowledge = {
         "grey_letters": set(),
         "yellow_letters": set(),
         "green_letters": {},  # e.g., {'a': {0}, 'e': {3}}
     }
-    
-    guesses = game.get("guesses", [])
-    feedback_history = game.get("feedback", [])
 
     for i, guess in enumerate(guesses):
         feedback = feedback_history[i]
         for j, letter in enumerate(guess):
-            if feedback[j] == 'green':
+            if feedback[j] == GREEN:
                 if letter not in knowledge["green_letters"]:
                     knowledge["green_letters"][letter] = set()
                 knowledge["green_letters"][letter].add(j)
-            elif feedback[j] == 'yellow':
+            elif feedback[j] == YELLOW:
                 knowledge["yellow_letters"].add(letter)
-            elif feedback[j] == 'grey':
+            elif feedback[j] == GREY:
                 knowledge["grey_letters"].add(letter)
 
     # A letter can be yellow/green and also grey if duplicated (e.g., guess 'apple', target 'paper')
     # True grey letters cannot be in the word at all.
+    knowledge["green_keys"] = set(knowledge["green_letters"])
     knowledge["grey_letters"] -= knowledge["yellow_letters"]
-    knowledge["grey_letters"] -= set(knowledge["green_letters"].keys())
+    knowledge["grey_letters"] -= knowledge["green_keys"]
+
+    knowledge["all_known_letters"] = knowledge["grey_letters"] | knowledge["yellow_letters"] | knowledge["green_keys"]
 
-    knowledge["all_known_letters"] = knowledge["grey_letters"] | knowledge["yellow_letters"] | set(knowledge["green_letters"].keys())
+    knowledge["grey_mask"] = letters_to_mask(knowledge["grey_letters"])
+    knowledge["yellow_mask"] = letters_to_mask(knowledge["yellow_letters"])
+    knowledge["green_key_mask"] = letters_to_mask(knowledge["green_keys"])
+    knowledge["all_known_mask"] = letters_to_mask(knowledge["all_known_letters"])
 
     return knowledge
 
-def is_word_valid_for_game(word: str, knowledge: Dict[str, Any]) -> bool:
-    """Checks if a word violates the hard constraints of a single game."""
-    # 1. Must not contain any known grey letters.
-    if not knowledge["grey_letters"].isdisjoint(word):
-        return False
-        
-    # 2. Must contain all yellow letters.
-    if not knowledge["yellow_letters"].issubset(word):
-        return False
-        
-    # 3. Must have all green letters in their correct positions.
-    for letter, positions in knowledge["green_letters"].items():
-        for pos in positions:
-            if word[pos] != letter:
-                return False
-                
-    return True
+def encode_game_knowledge(knowledge_per_game: List[Dict[str, Any]]) -> Tuple[np.ndarray, ...]:
+    """
+    Stacks the knowledge of several games into arrays for score_candidates.
+
+    Returns:
+    - green_pos: int8 array of shape (G, 5), the green letter index at each position or -1.
+    - grey_masks, yellow_masks, green_key_masks, all_known_masks: uint32 arrays of shape (G,).
+    """
+    green_pos = np.full((len(knowledge_per_game), 5), -1, dtype=np.int8)
+    for g, knowledge in enumerate(knowledge_per_game):
+        for letter, positions in knowledge["green_letters"].items():
+            for pos in positions:
+                green_pos[g, pos] = ord(letter) - 97
+
+    def masks(key: str) -> np.ndarray:
+        return np.array([k[key] for k in knowledge_per_game], dtype=np.uint32)
+
+    return green_pos, masks("grey_mask"), masks("yellow_mask"), masks("green_key_mask"), masks("all_known_mask")
+
+@njit(cache=True)
+def popcount32(x):
+    """Counts the set bits (letters) in a 32-bit mask (SWAR)."""
+    x = x - ((x >> 1) & 0x55555555)
+    x = (x & 0x33333333) + ((x >> 2) & 0x33333333)
+    x = (x + (x >> 4)) & 0x0F0F0F0F
+    return ((x * 0x01010101) & 0xFFFFFFFF) >> 24
+
+@njit(parallel=True, cache=True)
+def score_candidates(word_masks, word_positions, green_pos, grey_masks, yellow_masks, green_key_masks, all_known_masks):
+    """
+    Scores every candidate word against every game.
+
+    Args:
+        word_masks: uint32 letter bitmasks of the candidates, shape (N,).
+        word_positions: letter indices of the candidates, shape (N, 5).
+        green_pos: green letter index per game and position (-1 if unknown), shape (G, 5).
+        grey_masks, yellow_masks, green_key_masks, all_known_masks: per-game uint32 masks, shape (G,).
+
+    Returns:
+        A float64 array of scores, shape (N,), and an int64 array of details,
+        shape (N, 5), with columns in DETAIL_KEYS order.
+    """
+    n_words = word_masks.shape[0]
+    n_games = grey_masks.shape[0]
+    scores = np.empty(n_words, dtype=np.float64)
+    details = np.empty((n_words, 5), dtype=np.int64)
+
+    for c in prange(n_words):
+        wm = np.int64(word_masks[c])
+        valid_for_games = 0
+        total_new = 0
+        total_reused_grey = 0
+        total_reused_yellow = 0
+        total_reused_green = 0
+
+        for g in range(n_games):
+            grey_mask = np.int64(grey_masks[g])
+            yellow_mask = np.int64(yellow_masks[g])
+
+            # Must not contain grey letters, must contain all yellow letters,
+            # and must have all green letters in their correct positions.
+            valid = (wm & grey_mask) == 0 and (wm & yellow_mask) == yellow_mask
+            for pos in range(5):
+                if valid and green_pos[g, pos] >= 0 and word_positions[c, pos] != green_pos[g, pos]:
+                    valid = False
+            if valid:
+                valid_for_games += 1
+
+            # New letters (Exploration)
+            total_new += popcount32(wm & ~np.int64(all_known_masks[g]))
+
+            # Reused letters (Exploitation / Redundancy)
+            total_reused_grey += popcount32(wm & grey_mask)
+            total_reused_yellow += popcount32(wm & yellow_mask)
+            total_reused_green += popcount32(wm & np.int64(green_key_masks[g]))
+
+        # Heuristic score to rank guesses.
+        # Higher is better.
+        # - Prioritize validity across all games.
+        # - Encourage new letters (exploration).
+        # - Penalize reusing grey letters heavily.
+        scores[c] = (valid_for_games * 10) + (total_new * 1.5) - (total_reused_grey * 5)
+
+        details[c, 0] = valid_for_games
+        details[c, 1] = total_new
+        details[c, 2] = total_reused_grey
+        details[c, 3] = total_reused_yellow
+        details[c, 4] = total_reused_green
+
+    return scores, details
+
+# --- Reasoning Report Templates ---
+# Each template is %-formatted with a result's details plus its word and score.
+# The reused-letter fragments are only included when that count is non-zero.
+GREAT_TMPL = {
+    "header": "\n**Word: %(word)s**\nThis word got a **score of %(score).2f**.",
+    "valid": "It's currently valid for **%(valid_for_n_games)d game(s)**, which is a big plus because it can actually be used right now.",
+    "not_valid": "It's not valid for any specific games right now, but that's okay because we're thinking about general strategy.",
+    "new": "The big win here is it brings in **%(total_new_letters)d new letters**. That's a lot of fresh information, which is usually a good thing.",
+    "yellow": "It also smartly reuses **%(total_reused_yellow)d yellow letters**, meaning we're trying to figure out where some of these known letters finally fit.",
+    "green": "And it uses **%(total_reused_green)d green letters**, meaning it's building on what we already know for sure.",
+    "grey": "Crucially, it reused **%(total_reused_grey)d grey letters**, which is generally bad. We want to avoid using letters we know are wrong.",
+    "closing": "So, this is a very strong choice for moving forward.",
+}
+GOOD_TMPL = {
+    "header": "\n**Word: %(word)s**\nThis word scored **%(score).2f**.",
+    "valid": "It's valid for **%(valid_for_n_games)d game(s)**, so it's a usable word.",
+    "not_valid": "It's not valid for any current games.",
+    "new": "It introduces **%(total_new_letters)d new letters**, which is helpful, but maybe not as many as we'd ideally like.",
+    "yellow": "It incorporates **%(total_reused_yellow)d yellow letters**, trying to place them correctly.",
+    "green": "And it used **%(total_reused_green)d green letters**. While that helps confirm what we know, it doesn't expand our knowledge as much.",
+    "grey": "It reused **%(total_reused_grey)d grey letters**, which is a bit of a negative. We're spending a guess on letters we know aren't there.",
+    "closing": "Overall, it's a fine choice, just not a top-tier one for exploration.",
+}
+BAD_TMPL = {
+    "header": "\n**Word: %(word)s**\nThis word only scored **%(score).2f**.",
+    "valid": "It's valid for **%(valid_for_n_games)d game(s)**, so we could use it, but there are better options.",
+    "not_valid": "It's not valid for any current games, and it's not bringing enough new to the table.",
+    "new": "It only introduces **%(total_new_letters)d new letters**. That's not much bang for our buck in terms of new information.",
+    "yellow": "It reused **%(total_reused_yellow)d yellow letters**, but that's not enough to make up for other issues.",
+    "green": "And it used **%(total_reused_green)d green letters**. While confirming, it doesn't help us discover much new.",
+    "grey": "The biggest problem: it reused **%(total_reused_grey)d grey letters**. We know these letters are wrong, so using them again is a wasted guess.",
+    "closing": "This word isn't very efficient for solving our puzzles.",
+}
+
+def format_guess_reasoning(result: Dict[str, Any], tmpl: Dict[str, str]) -> str:
+    """Formats the reasoning paragraph for one analyzed word with the given template."""
+    d = result["details"]
+    fields = dict(d, word=result["word"], score=result["score"])
+    parts = [
+        tmpl["header"],
+        tmpl["valid"] if d["valid_for_n_games"] > 0 else tmpl["not_valid"],
+        tmpl["new"],
+    ]
+    if d["total_reused_yellow"] > 0:
+        parts.append(tmpl["yellow"])
+    if d["total_reused_green"] > 0:
+        parts.append(tmpl["green"])
+    if d["total_reused_grey"] > 0:
+        parts.append(tmpl["grey"])
+    parts.append(tmpl["closing"])
+    return "\n".join(parts) % fields
 
 def build_reasoning_report(analysis_results: List[Dict[str, Any]]) -> str:
     """   Builds a stream-of-consciousness report based on the analysis results.
@@ -87,8 +275,9 @@ def build_reasoning_report(analysis_results: List[Dict[str, Any]]) -> str:
     # Define thresholds. These might need tuning based on actual scores.
     # For this example, let's use relative thresholds.
     if analysis_results:
-        max_score = analysis_results[0]["score"]
-        min_score = analysis_results[-1]["score"]
+        # Only the extremes are needed, so this does not rely on the results being sorted
+        max_score = max(result["score"] for result in analysis_results)
+        min_score = min(result["score"] for result in analysis_results)
         score_range = max_score - min_score if max_score != min_score else 1 # Avoid division by zero
 
         for result in analysis_results:
@@ -118,100 +307,19 @@ def build_reasoning_report(analysis_results: List[Dict[str, Any]]) -> str:
     if great_guesses:
         report_parts.append("### Great Guesses\n")
         report_parts.append("These words are excellent for gathering new information and are strong contenders.")
-        for result in great_guesses:
-            word = result["word"]
-            score = result["score"]
-            details = result["details"]
-            valid_for_n_games = details["valid_for_n_games"]
-            total_new_letters = details["total_new_letters"]
-            total_reused_grey = details["total_reused_grey"]
-            total_reused_yellow = details["total_reused_yellow"]
-            total_reused_green = details["total_reused_green"]
-
-            report_parts.append(f"\n**Word: {word}**")
-            report_parts.append(f"This word got a **score of {score:.2f}**.")
-            
-            if valid_for_n_games > 0:
-                report_parts.append(f"It's currently valid for **{valid_for_n_games} game(s)**, which is a big plus because it can actually be used right now.")
-            else:
-                report_parts.append("It's not valid for any specific games right now, but that's okay because we're thinking about general strategy.")
-            
-            report_parts.append(f"The big win here is it brings in **{total_new_letters} new letters**. That's a lot of fresh information, which is usually a good thing.")
-            
-            if total_reused_yellow > 0:
-                report_parts.append(f"It also smartly reuses **{total_reused_yellow} yellow letters**, meaning we're trying to figure out where some of these known letters finally fit.")
-            if total_reused_green > 0:
-                report_parts.append(f"And it uses **{total_reused_green} green letters**, meaning it's building on what we already know for sure.")
-            if total_reused_grey > 0:
-                report_parts.append(f"Crucially, it reused **{total_reused_grey} grey letters**, which is generally bad. We want to avoid using letters we know are wrong.")
-            
-            report_parts.append("So, this is a very strong choice for moving forward.")
+        report_parts.append("\n".join(format_guess_reasoning(result, GREAT_TMPL) for result in great_guesses))
 
     # Reasoning for Good Guesses
     if good_guesses:
         report_parts.append("\n---\n### Good Guesses\n")
         report_parts.append("These words are decent choices, but they might not give us as much new information or might have a slight drawback.")
-        for result in good_guesses:
-            word = result["word"]
-            score = result["score"]
-            details = result["details"]
-            valid_for_n_games = details["valid_for_n_games"]
-            total_new_letters = details["total_new_letters"]
-            total_reused_grey = details["total_reused_grey"]
-            total_reused_yellow = details["total_reused_yellow"]
-            total_reused_green = details["total_reused_green"]
-
-            report_parts.append(f"\n**Word: {word}**")
-            report_parts.append(f"This word scored **{score:.2f}**.")
-            
-            if valid_for_n_games > 0:
-                report_parts.append(f"It's valid for **{valid_for_n_games} game(s)**, so it's a usable word.")
-            else:
-                report_parts.append("It's not valid for any current games.")
-
-            report_parts.append(f"It introduces **{total_new_letters} new letters**, which is helpful, but maybe not as many as we'd ideally like.")
-            
-            if total_reused_yellow > 0:
-                report_parts.append(f"It incorporates **{total_reused_yellow} yellow letters**, trying to place them correctly.")
-            if total_reused_green > 0:
-                report_parts.append(f"And it used **{total_reused_green} green letters**. While that helps confirm what we know, it doesn't expand our knowledge as much.")
-            if total_reused_grey > 0:
-                report_parts.append(f"It reused **{total_reused_grey} grey letters**, which is a bit of a negative. We're spending a guess on letters we know aren't there.")
-            
-            report_parts.append("Overall, it's a fine choice, just not a top-tier one for exploration.")
+        report_parts.append("\n".join(format_guess_reasoning(result, GOOD_TMPL) for result in good_guesses))
 
     # Reasoning for Bad Guesses
     if bad_guesses:
         report_parts.append("\n---\n### Bad Guesses\n")
         report_parts.append("These words are less ideal choices. They might not give us enough new information, or they might reuse too many letters we already know are wrong.")
-        for result in bad_guesses:
-            word = result["word"]
-            score = result["score"]
-            details = result["details"]
-            valid_for_n_games = details["valid_for_n_games"]
-            total_new_letters = details["total_new_letters"]
-            total_reused_grey = details["total_reused_grey"]
-            total_reused_yellow = details["total_reused_yellow"]
-            total_reused_green = details["total_reused_green"]
-
-            report_parts.append(f"\n**Word: {word}**")
-            report_parts.append(f"This word only scored **{score:.2f}**.")
-            
-            if valid_for_n_games > 0:
-                report_parts.append(f"It's valid for **{valid_for_n_games} game(s)**, so we could use it, but there are better options.")
-            else:
-                report_parts.append("It's not valid for any current games, and it's not bringing enough new to the table.")
-
-            report_parts.append(f"It only introduces **{total_new_letters} new letters**. That's not much bang for our buck in terms of new information.")
-            
-            if total_reused_yellow > 0:
-                report_parts.append(f"It reused **{total_reused_yellow} yellow letters**, but that's not enough to make up for other issues.")
-            if total_reused_green > 0:
-                report_parts.append(f"And it used **{total_reused_green} green letters**. While confirming, it doesn't help us discover much new.")
-            if total_reused_grey > 0:
-                report_parts.append(f"The biggest problem: it reused **{total_reused_grey} grey letters**. We know these letters are wrong, so using them again is a wasted guess.")
-            
-            report_parts.append("This word isn't very efficient for solving our puzzles.")
+        report_parts.append("\n".join(format_guess_reasoning(result, BAD_TMPL) for result in bad_guesses))
 
     report_parts.append("\n---\n### Conclusion\n")
     report_parts.append("Here's a breakdown of the words we considered:")
@@ -249,70 +357,38 @@ def impersonate_guesser(game_states: List[Dict[str, Any]]) -> Tuple[List[Dict[st
         A sorted list of dictionaries, each containing a candidate word and its analysis,
         and a string representing the reasoning report.
     """
-    wordlist = load_wordlist()
-    if not wordlist:
+    if not _WORDS:
         return [], "No wordlist loaded."
 
-    candidate_words = random.sample(wordlist, min(NUM_CANDIDATES, len(wordlist)))
+    # Per-game knowledge only depends on the game states, so compute it once per turn
+    # and skip scoring for games that are already won
+    is_game_won = [bool(game.get("guesses")) and game["guesses"][-1] == game["target_word"] for game in game_states]
+    knowledge_per_game = [
+        extract_game_knowledge(game)
+        for game, won in zip(game_states, is_game_won)
+        if not won
+    ]
+    game_arrays = encode_game_knowledge(knowledge_per_game)
 
     # Flatten list of all previous guesses for quick lookups
     previously_guessed = {guess for game in game_states for guess in game.get("guesses", [])}
 
-    analysis_results = []
-
-    for word in candidate_words:
-        if word in previously_guessed:
-            continue
-
-        total_new = 0
-        total_reused_grey = 0
-        total_reused_yellow = 0
-        total_reused_green = 0
-        valid_for_games = 0
-
-        word_letters = set(word)
-
-        for game in game_states:
-            # Skip scoring for games that are already won
-            if game.get("guesses") and game["guesses"][-1] == game["target_word"]:
-                continue
-
-            knowledge = extract_game_knowledge(game)
-
-            if is_word_valid_for_game(word, knowledge):
-                valid_for_games += 1
-
-            # --- Score the word based on exploration and exploitation ---
-            # New letters (Exploration)
-            new_letters = word_letters - knowledge["all_known_letters"]
-            total_new += len(new_letters)
-
-            # Reused letters (Exploitation / Redundancy)
-            total_reused_grey += len(word_letters.intersection(knowledge["grey_letters"]))
-            total_reused_yellow += len(word_letters.intersection(knowledge["yellow_letters"]))
-            total_reused_green += len(word_letters.intersection(knowledge["green_letters"].keys()))
-
-        # Heuristic score to rank guesses.
-        # Higher is better.
-        # - Prioritize validity across all games.
-        # - Encourage new letters (exploration).
-        # - Penalize reusing grey letters heavily.
-        score = (valid_for_games * 10) + (total_new * 1.5) - (total_reused_grey * 5)
-
-        analysis_results.append({
-            "word": word,
-            "score": score,
-            "details": {
-                "valid_for_n_games": valid_for_games,
-                "total_new_letters": total_new,
-                "total_reused_grey": total_reused_grey,
-                "total_reused_yellow": total_reused_yellow,
-                "total_reused_green": total_reused_green,
-            }
-        })
-
-    # Sort results from best score to worst
-    analysis_results.sort(key=lambda x: x["score"], reverse=True)
+    idx = np.random.choice(len(_WORDS), min(NUM_CANDIDATES, len(_WORDS)), replace=False)
+    idx = np.array([i for i in idx if _WORDS[i] not in previously_guessed], dtype=np.intp)
+    candidate_words = [_WORDS[i] for i in idx]
+
+    scores, details = score_candidates(WORD_MASKS[idx], WORD_BYTES[idx], *game_arrays)
+
+    # Sort results from best score to worst (stable, so ties keep their sampled order)
+    ranking = np.argsort(-scores, kind="stable")
+    analysis_results = [
+        {
+            "word": candidate_words[i],
+            "score": float(scores[i]),
+            "details": dict(zip(DETAIL_KEYS, details[i].tolist())),
+        }
+        for i in ranking
+    ]
 
     # Build a reasoning report based on the analysis results
     reasoning_report = build_reasoning_report(analysis_results)
@@ -333,13 +409,13 @@ if __name__ == '__main__':
         
         # Simulate first guess 'audio'
         guess1 = 'audio'
-        feedback1 = ['yellow', 'grey', 'grey', 'grey', 'grey'] # Simplified feedback for demo
+        feedback1 = np.array([YELLOW, GREY, GREY, GREY, GREY], dtype=np.int8) # Simplified feedback for demo
         game["guesses"].append(guess1)
         game["feedback"].append(feedback1)
 
         # Simulate second guess 'trice'
         guess2 = 'trice'
-        feedback2 = ['grey', 'yellow', 'yellow', 'green', 'green'] # Simplified feedback for demo
+        feedback2 = np.array([GREY, YELLOW, YELLOW, GREEN, GREEN], dtype=np.int8) # Simplified feedback for demo
         game["guesses"].append(guess2)
         game["feedback"].append(feedback2)
 
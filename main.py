@@ -250,21 +250,17 @@ def format_colored_guess(guess: str, feedback: List[str]) -> str:
 
 def extract_final_guess(llm_response: str) -> str:
     """Extracts the 5-letter guess from the oracle's full response."""
-    response_lower = llm_response.lower().strip()
+    response_lower = llm_response.lower()
     start_index = response_lower.find(FINAL_GUESS_MARKER.lower())
-    guess_text = response_lower[start_index + len(FINAL_GUESS_MARKER):].strip()
-    guess_text = ''.join([ch for ch in guess_text if ch.isalpha() or ch.isspace()])
-
     if start_index != -1:
-        # Extract the word immediately following the marker
-        potential_guess = guess_text.strip()
-        # Find the first 5-letter word in the remaining string
-        for word in potential_guess.split():
-            cleaned_word = ''.join([ch for ch in word if ch.isalpha()])
-            if is_valid_guess(cleaned_word):
-                return cleaned_word
-    
-    # Fallback: find the last valid 5-letter word in the entire response
+        # Find the first 5-letter word after the marker, ignoring punctuation
+        guess_text = response_lower[start_index + len(FINAL_GUESS_MARKER):]
+        guess_text = ''.join([ch for ch in guess_text if ch.isalpha() or ch.isspace()])
+        for word in guess_text.split():
+            if is_valid_guess(word):
+                return word
+
+    # Fallback, only when the marker path failed: find the last valid 5-letter word in the entire response
     response_no_punctuation_spaces_ok = ''.join([c for c in llm_response if c.isalpha() or c.isspace()]).lower()
     all_words = [''.join(filter(str.isalpha, word)) for word in response_no_punctuation_spaces_ok.split()]
     all_words = [word for word in all_words if len(word) == 5]
@@ -1,17 +1,33 @@
+import asyncio
 import json
 import csv
-import io
 import random
 import os
+import re
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Any
 
-from ollama import Client
+import numpy as np
+from numba import njit
+from ollama import AsyncClient
+
+# orjson is optional; it serializes the boards much faster
+try:
+    import orjson
+
+    def dumps_boards(boards: List[List[Dict[str, Any]]]) -> str:
+        return orjson.dumps(named_feedback_boards(boards)).decode()
+except ImportError:
+    def dumps_boards(boards: List[List[Dict[str, Any]]]) -> str:
+        return json.dumps(named_feedback_boards(boards))
 
 # --- Configuration ---
 # The model you are evaluating (or your fine-tuned model)
 MODEL_TO_EVALUATE = "gemma3:1b" 
 OLLAMA_HOST = 'http://localhost:11434'
+# Requests kept in flight at once; match the server's OLLAMA_NUM_PARALLEL
+OLLAMA_NUM_PARALLEL = 4
 
 # Evaluation Parameters
 NUM_ROLLOUTS = 10
@@ -20,6 +36,18 @@ NUM_GAMES_PER_ROLLOUT = 9
 WORDLIST_FILE = "wordlist.txt"
 REPORT_DIR = "prompts"
 FINAL_GUESS_MARKER = "Final Guess:"
+# Compiled once: the marker (any case/spacing) and a standalone 5-letter ASCII word
+# (re.ASCII keeps case folding from matching letters like "ſ" or "K" as a-z)
+FINAL_GUESS_RE = re.compile(r"\s+".join(map(re.escape, FINAL_GUESS_MARKER.split())), re.IGNORECASE)
+WORD5_RE = re.compile(r"(?<![a-z])[a-z]{5}(?![a-z])", re.IGNORECASE | re.ASCII)
+
+# Feedback codes (int8), indexes into CSV_GUESS_FORMATS
+GREY = 0
+YELLOW = 1
+GREEN = 2
+CSV_GUESS_FORMATS = ("_%s_", "-%s-", "=%s=")
+# Color names by code, as the saved report lists them
+FEEDBACK_NAMES = ("grey", "yellow", "green")
 
 # Score Calculation
 SCORE_WIN = 100
@@ -77,7 +105,7 @@ PROMPT_SUGGESTIONS = {
 
 
 # --- Initialize Client ---
-eval_client = Client(host=OLLAMA_HOST)
+eval_client = AsyncClient(host=OLLAMA_HOST)
 
 # --- Core Wordle Logic (Mostly unchanged) ---
 def load_wordlist() -> List[str]:
@@ -89,39 +117,55 @@ def initialize_games() -> List[Dict[str, Any]]:
     target_words = random.sample(words, NUM_GAMES_PER_ROLLOUT)
     return [{"target_word": word, "guesses": [], "feedback": []} for word in target_words]
 
-def generate_feedback(guess: str, target_word: str) -> List[str]:
-    feedback = [''] * 5; target_list = list(target_word); guess_list = list(guess)
-    for i in range(5):
-        if guess_list[i] == target_list[i]:
-            feedback[i] = "green"; target_list[i] = None; guess_list[i] = None
-    for i in range(5):
-        if guess_list[i] is not None:
-            if guess_list[i] in target_list:
-                feedback[i] = "yellow"; target_list[target_list.index(guess_list[i])] = None
+def encode_words(words: List[str]) -> np.ndarray:
+    """Encodes 5-letter words as a uint8 array of letter indices (0-25), shape (B, 5)."""
+    return np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(-1, 5) - ord("a")
+
+@njit(cache=True)
+def generate_feedback_batch(guess: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Scores one encoded guess, shape (5,), against a batch of encoded targets, shape (B, 5).
+    Returns the feedback as an int8 array of GREY/YELLOW/GREEN codes, shape (B, 5).
+    """
+    feedback = np.zeros(targets.shape, dtype=np.int8)
+    # Count table of the target letters left unmatched by the green pass
+    target_counts = np.zeros(26, dtype=np.int8)
+    for b in range(targets.shape[0]):
+        target_counts[:] = 0
+        for i in range(5):
+            if guess[i] == targets[b, i]:
+                feedback[b, i] = GREEN
             else:
-                feedback[i] = "grey"
+                target_counts[targets[b, i]] += 1
+        # Yellow pass, left to right, consuming one unmatched target letter per yellow
+        for i in range(5):
+            if feedback[b, i] != GREEN and target_counts[guess[i]] > 0:
+                feedback[b, i] = YELLOW
+                target_counts[guess[i]] -= 1
     return feedback
 
-def format_csv_guess(guess: str, feedback: List[str]) -> str:
-    return "".join(f"={l}=" if c=="green" else f"-{l}-" if c=="yellow" else f"_{l}_" for l, c in zip(guess, feedback))
+def format_csv_guess(guess: str, feedback: np.ndarray) -> str:
+    # Cast so the cache key is one byte per code whatever the feedback's dtype
+    return _format_csv_guess(guess, np.asarray(feedback, dtype=np.int8).tobytes())
+
+@lru_cache(maxsize=8192)
+def _format_csv_guess(guess: str, feedback: bytes) -> str:
+    return "".join(CSV_GUESS_FORMATS[c] % l for l, c in zip(guess, feedback))
+
+def game_csv_cells(game: Dict[str, Any]) -> List[str]:
+    """Formatted CSV cells for a game's guesses, reusing the rollout's cached rows if present."""
+    if "_csv_rows" in game:
+        return game["_csv_rows"]
+    return [format_csv_guess(guess, feedback) for guess, feedback in zip(game["guesses"], game["feedback"])]
 
 def generate_csv_content(game_states: List[Dict[str, Any]]) -> str:
+    # Cells are only =l=/-l-/_l_ tokens, so no CSV quoting is needed; rows end in
+    # \r\n like csv.writer's default dialect
     headers = [f"Game{i+1}" for i in range(len(game_states))]
     max_guesses = max(len(g["guesses"]) for g in game_states) if game_states else 0
-    rows = []
-    for i in range(max_guesses):
-        row = [format_csv_guess(g["guesses"][i], g["feedback"][i]) if i < len(g["guesses"]) else "" for g in game_states]
-        rows.append(row)
-    output = io.StringIO(); writer = csv.writer(output)
-    writer.writerow(headers); writer.writerows(rows)
-    return output.getvalue()
-
-def is_game_over(game: Dict[str, Any]) -> bool:
-    if game["guesses"] and game["guesses"][-1] == game["target_word"]:
-        return True
-    if len(game["guesses"]) >= MAX_GUESSES:
-        return True
-    return False
+    columns = [game_csv_cells(g) + [""] * (max_guesses - len(g["guesses"])) for g in game_states]
+    lines = [",".join(headers)] + [",".join(row) for row in zip(*columns)]
+    return "\r\n".join(lines) + "\r\n"
 
 def compile_report(game_states: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
@@ -139,9 +183,10 @@ def compile_report(game_states: List[Dict[str, Any]]) -> Dict[str, Any]:
             games_lost += 1
 
         # Calculate scores for green and yellow tiles
-        for feedback in game["feedback"]:
-            total_score += feedback.count("green") * SCORE_GREEN
-            total_score += feedback.count("yellow") * SCORE_YELLOW
+        if game["feedback"]:
+            feedback = np.vstack(game["feedback"])
+            total_score += int((feedback == GREEN).sum()) * SCORE_GREEN
+            total_score += int((feedback == YELLOW).sum()) * SCORE_YELLOW
 
     # return
     return {
@@ -150,61 +195,79 @@ def compile_report(game_states: List[Dict[str, Any]]) -> Dict[str, Any]:
         "total_score": total_score
     }       
 
-def is_valid_guess(guess: str) -> bool:
-    return len(guess) == 5 and guess.isalpha()
-
 # --- Evaluation-Specific Functions ---
-def get_agent_guess(prompt: str) -> str:
-    """Gets a guess from the model being evaluated."""
-    response = eval_client.chat(
-        model=MODEL_TO_EVALUATE,
-        messages=[{'role': 'user', 'content': prompt}]
-    )
+async def get_agent_guess(prompt: str, ollama_slots: asyncio.Semaphore) -> str:
+    """Gets a guess from the model being evaluated; `ollama_slots` caps requests in flight."""
+    async with ollama_slots:
+        response = await eval_client.chat(
+            model=MODEL_TO_EVALUATE,
+            messages=[{'role': 'user', 'content': prompt}]
+        )
     llm_response = response.get("message", {}).get("content", "").strip()
     
-    # Extract guess logic
-    response_lower = llm_response.lower()
-    start_index = response_lower.find(FINAL_GUESS_MARKER.lower())
-    if start_index != -1:
-        potential_guess = response_lower[start_index + len(FINAL_GUESS_MARKER):].strip()
-        for word in potential_guess.split():
-            cleaned_word = ''.join(filter(str.isalpha, word))
-            if is_valid_guess(cleaned_word):
-                return cleaned_word
+    # Extract guess logic: first 5-letter word after the marker
+    marker = FINAL_GUESS_RE.search(llm_response)
+    if marker:
+        guess = WORD5_RE.search(llm_response, marker.end())
+        if guess:
+            return guess.group().lower()
     
-    words = ''.join(c if c.isalpha() else ' ' for c in response_lower).split()
-    valid_guesses = [word for word in words if is_valid_guess(word)]
+    # Otherwise the last 5-letter word in the response
+    valid_guesses = WORD5_RE.findall(llm_response)
     if valid_guesses:
-        return valid_guesses[-1]
+        return valid_guesses[-1].lower()
         
     return "audio" # Fallback
 
-def run_single_rollout(prompt_template: str) -> (int, List[Dict[str, Any]]):
+async def run_single_rollout(prompt_template: str, ollama_slots: asyncio.Semaphore) -> (int, List[Dict[str, Any]]):
     """Plays one full 9-board game session and returns the score and final board state."""
     game_states = initialize_games()
+    targets = encode_words([game["target_word"] for game in game_states])
+    # Formatted CSV cells per game, appended as guesses are made instead of
+    # re-formatting the whole history every turn
+    for game in game_states:
+        game["_csv_rows"] = []
     
-    for turn in range(MAX_GUESSES):
-        if all(is_game_over(g) for g in game_states):
-            break
-        
+    # Indices of the games still being played; a game leaves once won or out of guesses
+    active = list(range(len(game_states)))
+    while active:
         # Create the specific prompt for this turn
         csv_state = generate_csv_content(game_states)
         prompt = prompt_template.format(game_state_csv=csv_state)
         
-        guess = get_agent_guess(prompt)
+        guess = await get_agent_guess(prompt, ollama_slots)
         
-        # Apply guess to all non-completed games
-        for game in game_states:
-            if not is_game_over(game):
-                feedback = generate_feedback(guess, game["target_word"])
-                game["guesses"].append(guess)
-                game["feedback"].append(feedback)
+        # Apply guess to all non-completed games, scoring them in one batch
+        feedback = generate_feedback_batch(encode_words([guess])[0], targets[active])
+        won = (feedback == GREEN).all(axis=1)
+        still_active = []
+        for row, i in enumerate(active):
+            game_states[i]["guesses"].append(guess)
+            game_states[i]["feedback"].append(feedback[row])
+            game_states[i]["_csv_rows"].append(format_csv_guess(guess, feedback[row]))
+            if not won[row] and len(game_states[i]["guesses"]) < MAX_GUESSES:
+                still_active.append(i)
+        active = still_active
                 
+    # The cached cells are only needed while playing; keep them out of the saved boards
+    for game in game_states:
+        del game["_csv_rows"]
+
     report = compile_report(game_states)
     score = report["games_won"] # Score is the number of games won
     score = report["total_score"]  # Total score based on green and yellow tiles
     return score, game_states
 
+def named_feedback_boards(boards: List[List[Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+    """Copies the rollout boards with each feedback code array replaced by its color names."""
+    return [
+        [
+            {**game, "feedback": [[FEEDBACK_NAMES[code] for code in feedback.tolist()] for feedback in game["feedback"]]}
+            for game in board
+        ]
+        for board in boards
+    ]
+
 def save_evaluation_report(results: List[Dict]):
     """Saves the complete evaluation results to a single CSV file."""
     if not results:
@@ -222,26 +285,29 @@ def save_evaluation_report(results: List[Dict]):
         
     print(f"Evaluation report saved to {filename}")
 
-def evaluate_prompts():
+async def evaluate_prompts():
     """Main function to orchestrate the prompt evaluation process."""
     all_results = []
+    # Created here rather than at import so it belongs to this run's event loop
+    ollama_slots = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
     
     for prompt_id, prompt_template in PROMPT_SUGGESTIONS.items():
         print(f"\n--- Evaluating: {prompt_id} ---")
         rollout_scores = []
         rollout_boards = []
         
-        for i in range(NUM_ROLLOUTS):
-            print(f"Running Rollout {i+1}/{NUM_ROLLOUTS} for {prompt_id}...")
-            score, final_boards = run_single_rollout(prompt_template)
+        # Rollouts share no state, so run them concurrently to overlap model latency
+        print(f"Running {NUM_ROLLOUTS} Rollouts for {prompt_id}...")
+        rollouts = await asyncio.gather(*[run_single_rollout(prompt_template, ollama_slots) for _ in range(NUM_ROLLOUTS)])
+        for i, (score, final_boards) in enumerate(rollouts):
             rollout_scores.append(score)
             rollout_boards.append(final_boards)
             print(f"Rollout {i+1} Score (Games Won): {score}/{NUM_GAMES_PER_ROLLOUT}")
             
         average_score = sum(rollout_scores) / len(rollout_scores) if rollout_scores else 0
         
-        # Sanitize boards for CSV by converting to JSON string
-        boards_json = json.dumps(rollout_boards)
+        # Sanitize boards for CSV by converting to JSON string (feedback codes become color names)
+        boards_json = dumps_boards(rollout_boards)
         
         result_data = {
             "timestamp": datetime.now().isoformat(),
@@ -260,4 +326,4 @@ def evaluate_prompts():
     save_evaluation_report(all_results)
 
 if __name__ == "__main__":
-    evaluate_prompts()
+    asyncio.run(evaluate_prompts())
@@ -1,171 +1,309 @@
+import asyncio
+import hashlib
 import json
-import csv
-import io
 import random
 import os
+import re
 from datetime import datetime
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, BinaryIO, Optional
 
-from ollama import Client
+import numpy as np
+from numba import njit, prange
+from ollama import AsyncClient
+
+# orjson is optional; it encodes straight to bytes in a single C pass
+try:
+    import orjson
+
+    def dumps_example(example: Dict[str, Any]) -> bytes:
+        return orjson.dumps(example)
+except ImportError:
+    def dumps_example(example: Dict[str, Any]) -> bytes:
+        return json.dumps(example).encode("utf-8")
 
 # --- Configuration ---
 # The model that will act as the "expert" to generate training data.
 # For best results, use a powerful model (e.g., gpt-4, claude-3-opus).
 ORACLE_MODEL_NAME = "gemma3:4b"  # deepseek-r1:8b
 OLLAMA_HOST = 'http://localhost:11434'
+# Oracle requests kept in flight at once; match the server's OLLAMA_NUM_PARALLEL
+OLLAMA_NUM_PARALLEL = 4
+# Ask the oracle about each board separately (one guess per board) instead of one
+# joint prompt for all nine. The joint prompt is what main.py's agent is trained on.
+PER_BOARD_PROMPTS = False
 
 MAX_GUESSES = 6
 NUM_GAMES_PER_RUN = 9 # How many concurrent games to simulate for one data generation run
+SEED = None # Set to an int to make each simulation's target words reproducible
 WORDLIST_FILE = "wordlist.txt"
 ORACLE_TRAIN_FOLDER = "train/"
 OUTPUT_DATASET_FILE = "wordle_training_data.jsonl"
 FINAL_GUESS_MARKER = "Final Guess:"
+# Compiled once: the marker (any case/spacing) and a standalone 5-letter ASCII word
+# (re.ASCII keeps case folding from matching letters like "ſ" or "K" as a-z)
+FINAL_GUESS_RE = re.compile(r"\s+".join(map(re.escape, FINAL_GUESS_MARKER.split())), re.IGNORECASE)
+WORD5_RE = re.compile(r"(?<![a-z])[a-z]{5}(?![a-z])", re.IGNORECASE | re.ASCII)
+# Precomputed guess x target feedback table, keyed by a hash of the wordlist and
+# a format version; bump PATTERNS_VERSION whenever the pattern encoding or kernel changes
+PATTERNS_VERSION = 1
+PATTERNS_FILE = "feedback_patterns_v{version}_{digest}.npy"
+
+# Feedback codes (uint8)
+GREY = 0
+YELLOW = 1
+GREEN = 2
+# Each row is a base-3 pattern (sum of code * 3**position) decoded into its 5 codes
+PATTERN_CODES = np.array([[(pattern // 3**i) % 3 for i in range(5)] for pattern in range(3**5)], dtype=np.uint8)
 
 # --- Initialize Ollama Client ---
 # This client will be our "oracle"
-oracle_client = Client(host=OLLAMA_HOST)
+oracle_client = AsyncClient(host=OLLAMA_HOST)
 
 # --- Core Wordle Logic ---
 
+@lru_cache(maxsize=1)
 def load_wordlist() -> List[str]:
-    """Load words from the wordlist file."""
+    """Load words from the wordlist file (read once; do not modify the returned list)."""
     with open(WORDLIST_FILE, "r") as file:
         return file.read().splitlines()
 
-def initialize_games() -> List[Dict[str, Any]]:
-    """Initialize nine Wordle games with unique target words."""
+def pack_words(words: List[str]) -> np.ndarray:
+    """Pack 5-letter words into uint64s, one letter index (0-25) per byte, first letter lowest."""
+    letters = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(-1, 5) - ord("a")
+    return np.pad(letters, ((0, 0), (0, 3))).view("<u8").ravel()
+
+def encode_word(word: str) -> np.uint64:
+    """Encode a 5-letter word as a packed uint64 (see pack_words)."""
+    word_id = WORD_IDS.get(word)
+    if word_id is not None:
+        return WORDS_PACKED[word_id]
+    return pack_words([word])[0]
+
+# Encoded once at load time; guesses outside the wordlist are encoded on demand
+WORDS = load_wordlist()
+WORD_IDS = {word: i for i, word in enumerate(WORDS)}
+WORDS_PACKED = pack_words(WORDS)
+
+def initialize_games(rng: random.Random) -> List[Dict[str, Any]]:
+    """Initialize nine Wordle games with unique target words drawn from `rng`."""
     words = load_wordlist()
-    target_words = random.sample(words, NUM_GAMES_PER_RUN)
-    return [{"target_word": word, "guesses": [], "feedback": []} for word in target_words]
+    target_words = rng.sample(words, NUM_GAMES_PER_RUN)
+    # "formatted_rows" holds each guess's CSV cell, appended as guesses are applied;
+    # "done" is set once the game is won or out of guesses
+    return [
+        {"target_word": word, "guesses": [], "feedback": [], "formatted_rows": [], "done": False}
+        for word in target_words
+    ]
 
-def format_csv_guess(guess: str, feedback: List[str]) -> str:
+# Every (letter, code) cell of the CSV, formatted once
+CSV_CELLS = {
+    (letter, code): cell
+    for letter in "abcdefghijklmnopqrstuvwxyz"
+    for code, cell in (
+        (GREEN, f"={letter.upper()}="),
+        (YELLOW, f"-{letter.upper()}-"),
+        (GREY, f"_{letter}_"),
+    )
+}
+
+def format_csv_guess(guess: str, feedback: np.ndarray) -> str:
     """Format a guess for CSV output with feedback indicators."""
-    result = ''
-    for letter, color in zip(guess, feedback):
-        big_letter = letter.upper()
-        result += "".join(
-            f"={big_letter}=" if color == "green" else
-            f"-{big_letter}-" if color == "yellow" else
-            f"_{letter}_"
-            
-        )
-    return result
+    return "".join(CSV_CELLS[cell] for cell in zip(guess, feedback.tolist()))
 
 def generate_csv_content(game_states: List[Dict[str, Any]]) -> str:
     """Generate the game progress as a CSV string."""
+    # Cells are only =L=/-L-/_l_ tokens, so no CSV quoting is needed; rows end in
+    # \r\n like csv.writer's default dialect so prompts stay byte-identical
     headers = [f"Game{i+1}" for i in range(len(game_states))]
     max_guesses = max(len(game["guesses"]) for game in game_states) if game_states else 0
-    rows = []
-    for guess_index in range(max_guesses):
-        row_data = []
-        for game in game_states:
-            if guess_index < len(game["guesses"]):
-                guess = game["guesses"][guess_index]
-                feedback = game["feedback"][guess_index]
-                formatted_guess = format_csv_guess(guess, feedback)
-                row_data.append(formatted_guess)
-            else:
-                row_data.append("")
-        rows.append(row_data)
+    columns = [game["formatted_rows"] + [""] * (max_guesses - len(game["formatted_rows"])) for game in game_states]
+    lines = [",".join(headers)] + [",".join(row) for row in zip(*columns)]
+    return "\r\n".join(lines) + "\r\n"
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(headers)
-    writer.writerows(rows)
-    return output.getvalue()
+# The instructions around the CSV never change, so they are built once
+PROMPT_PREFIX = (
+    "You are an expert Wordle player. "
+    "Based on the current game states, generate a single 5-letter word guess. "
+    "You are playing nine games of Wordle at the same time.\n"
+    "The game state as a csv: \n"
+)
+PROMPT_SUFFIX = (
+    " \n"
+    "The indicators mean: _r_: r is wrong letter (grey/bad), -S-: s is right letter, wrong spot (yellow/ok), =T=: t is right spot (green/great). \n"
+    "---\n"
+    "First, do some reasoning about each board. "
+    "Second, do some reasoning about the letters you see. "
+    "Third, do some reasoning about the letters you have not seen. "
+    "Fourth, do some reasoning about the grey and yellow letters specifically. "
+    "Finally, make a 5-letter word guess. "
+    "End your response with 'Final Guess: <your_guess>'."
+)
+SINGLE_BOARD_PROMPT_PREFIX = (
+    "You are an expert Wordle player. "
+    "Based on the current game state, generate a single 5-letter word guess.\n"
+    "The game state as a csv: \n"
+)
+SINGLE_BOARD_PROMPT_SUFFIX = PROMPT_SUFFIX.replace("about each board", "about the board")
 
 def create_wordle_prompt(game_states: List[Dict[str, Any]]) -> str:
     """Create the prompt for the LLM."""
-    state_csv = generate_csv_content(game_states)
-    return (
-        "You are an expert Wordle player. "
-        "Based on the current game states, generate a single 5-letter word guess. "
-        "You are playing nine games of Wordle at the same time.\n"
-        "The game state as a csv: \n"
-        f"{state_csv} \n"
-        "The indicators mean: _r_: r is wrong letter (grey/bad), -S-: s is right letter, wrong spot (yellow/ok), =T=: t is right spot (green/great). \n"
-        "---\n"
-        "First, do some reasoning about each board. "
-        "Second, do some reasoning about the letters you see. "
-        "Third, do some reasoning about the letters you have not seen. "
-        "Fourth, do some reasoning about the grey and yellow letters specifically. "
-        "Finally, make a 5-letter word guess. "
-        "End your response with 'Final Guess: <your_guess>'."
-    )
+    return PROMPT_PREFIX + generate_csv_content(game_states) + PROMPT_SUFFIX
+
+def create_single_board_prompt(game: Dict[str, Any]) -> str:
+    """Create the prompt for the LLM covering a single board."""
+    return SINGLE_BOARD_PROMPT_PREFIX + generate_csv_content([game]) + SINGLE_BOARD_PROMPT_SUFFIX
 
-def generate_feedback(guess: str, target_word: str) -> List[str]:
-    """Generate feedback for a guess."""
-    feedback = [''] * 5
-    target_list = list(target_word)
-    guess_list = list(guess)
+# SWAR masks over the five letter bytes of a packed word
+LOW7_BYTES = np.uint64(0x7F7F7F7F7F)
+HIGH_BYTES = np.uint64(0x8080808080)
 
-    # First pass for green letters
+@njit(cache=True)
+def feedback_pattern(guess: np.uint64, target: np.uint64) -> int:
+    """Generate feedback for a packed guess as a base-3 packed pattern."""
+    # Greens are the zero bytes of guess ^ target; this form avoids the false
+    # positives the shorter (x - 0x01..) & ~x trick gives above a zero byte
+    diff = guess ^ target
+    green = ~(((diff & LOW7_BYTES) + LOW7_BYTES) | diff | LOW7_BYTES) & HIGH_BYTES
+    if green == HIGH_BYTES:
+        return 242  # all green
+
+    remaining = np.zeros(26, dtype=np.int64)
+    letters = np.empty(5, dtype=np.int64)
+    is_green = np.empty(5, dtype=np.bool_)
     for i in range(5):
-        if guess_list[i] == target_list[i]:
-            feedback[i] = "green"
-            target_list[i] = None  # Mark as used
-            guess_list[i] = None   # Mark as used
+        shift = np.uint64(8 * i)
+        letters[i] = np.int64((guess >> shift) & np.uint64(0xFF))
+        is_green[i] = (green >> (shift + np.uint64(7))) & np.uint64(1) != 0
+        if not is_green[i]:
+            remaining[np.int64((target >> shift) & np.uint64(0xFF))] += 1
 
-    # Second pass for yellow and grey letters
+    pattern = 0
+    place = 1
     for i in range(5):
-        if guess_list[i] is not None:
-            if guess_list[i] in target_list:
-                feedback[i] = "yellow"
-                target_list[target_list.index(guess_list[i])] = None # Mark as used
-            else:
-                feedback[i] = "grey"
-    return feedback
+        if is_green[i]:
+            pattern += GREEN * place
+        elif remaining[letters[i]] > 0:
+            pattern += YELLOW * place
+            remaining[letters[i]] -= 1
+        place *= 3
+    return pattern
+
+@njit(parallel=True, cache=True)
+def build_pattern_table(packed_words: np.ndarray) -> np.ndarray:
+    """Feedback patterns for every (guess, target) pair of packed words, shape (N, N)."""
+    n = packed_words.shape[0]
+    patterns = np.empty((n, n), dtype=np.uint16)
+    for g in prange(n):
+        for t in range(n):
+            patterns[g, t] = feedback_pattern(packed_words[g], packed_words[t])
+    return patterns
+
+def load_pattern_table() -> np.ndarray:
+    """Load the feedback table for the current wordlist from disk, building and saving it if missing."""
+    digest = hashlib.sha1("\n".join(WORDS).encode("ascii")).hexdigest()[:12]
+    filename = PATTERNS_FILE.format(version=PATTERNS_VERSION, digest=digest)
+    if os.path.exists(filename):
+        return np.load(filename)
+    patterns = build_pattern_table(WORDS_PACKED)
+    # Write to a private temporary file and move it into place, so a run starting
+    # at the same time never loads a half-written table
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_filename, "wb") as file:
+        np.save(file, patterns)
+    os.replace(temp_filename, filename)
+    return patterns
+
+PATTERNS = load_pattern_table()
+
+def generate_feedback(guess: str, target_word: str) -> np.ndarray:
+    """Generate feedback for a guess as a uint8 array of GREY/YELLOW/GREEN codes."""
+    guess_id = WORD_IDS.get(guess)
+    target_id = WORD_IDS.get(target_word)
+    if guess_id is not None and target_id is not None:
+        pattern = PATTERNS[guess_id, target_id]
+    else:
+        # Guesses outside the wordlist are scored directly by the compiled kernel
+        pattern = feedback_pattern(encode_word(guess), encode_word(target_word))
+    return PATTERN_CODES[pattern]
 
 def apply_guess_to_games(guess: str, game_states: List[Dict[str, Any]]):
-    """Apply a guess to all games and update their state in place."""
+    """Apply a guess to all unfinished games and update their state in place."""
     for game in game_states:
-        if len(game["guesses"]) < MAX_GUESSES and game["guesses"] and game["guesses"][-1] != game["target_word"]:
-            feedback = generate_feedback(guess, game["target_word"])
-            game["guesses"].append(guess)
-            game["feedback"].append(feedback)
+        apply_guess_to_game(guess, game)
 
-def is_valid_guess(guess: str) -> bool:
-    """Check if a guess is a 5-letter alphabetic word."""
-    return len(guess) == 5 and guess.isalpha()
+def apply_guess_to_game(guess: str, game: Dict[str, Any]):
+    """Apply a guess to a single game, unless it is already done."""
+    if game["done"]:
+        return
+    feedback = generate_feedback(guess, game["target_word"])
+    game["guesses"].append(guess)
+    game["feedback"].append(feedback)
+    game["formatted_rows"].append(format_csv_guess(guess, feedback))
+    game["done"] = guess == game["target_word"] or len(game["guesses"]) >= MAX_GUESSES
 
 # --- Data Generation Logic ---
 
-def get_oracle_response(prompt: str) -> str:
+async def get_oracle_response(
+    prompt: str, oracle_slots: asyncio.Semaphore, next_guess: Optional[asyncio.Future] = None
+) -> str:
     """
     Gets a high-quality response from the oracle model.
     *** FOR UNSLOTH TRAINING ***
     Replace this with a call to a more capable model for better results?
+
+    `oracle_slots` caps how many requests are in flight. The response is streamed.
+    If `next_guess` is given it is resolved with the oracle's guess as soon as the
+    marker and a complete word have arrived, so the caller can start the next turn
+    while the rest of the response streams in.
     """
-    print(f"Querying oracle model: {ORACLE_MODEL_NAME}...")
-    response = oracle_client.chat(
-        model=ORACLE_MODEL_NAME,
-        messages=[{'role': 'user', 'content': prompt}]
-    )
-    return response.get("message", {}).get("content", "").strip()
+    text = ""
+    scanned = 0
+    marker_end = -1
+    try:
+        async with oracle_slots:
+            print(f"Querying oracle model: {ORACLE_MODEL_NAME}...")
+            async for chunk in await oracle_client.chat(
+                model=ORACLE_MODEL_NAME,
+                messages=[{'role': 'user', 'content': prompt}],
+                stream=True
+            ):
+                text += chunk["message"]["content"]
+                if next_guess is None or next_guess.done():
+                    continue
+                if marker_end < 0:
+                    # Rescan a little of the previous text in case the marker was split across chunks
+                    marker = FINAL_GUESS_RE.search(text, max(0, scanned - len(FINAL_GUESS_MARKER) - 16))
+                    scanned = len(text)
+                    if not marker:
+                        continue
+                    marker_end = marker.end()
+                guess = WORD5_RE.search(text, marker_end)
+                # A word at the very end of the text may still grow, e.g. "crane" -> "cranes"
+                if guess and guess.end() < len(text):
+                    next_guess.set_result(guess.group().lower())
+    except BaseException as e:
+        if next_guess is not None and not next_guess.done():
+            next_guess.set_exception(e)
+        raise
+    response = text.strip()
+    if next_guess is not None and not next_guess.done():
+        next_guess.set_result(extract_final_guess(response))
+    return response
 
 def extract_final_guess(llm_response: str) -> str:
     """Extracts the 5-letter guess from the oracle's full response."""
-    response_lower = llm_response.lower().strip()
-    start_index = response_lower.find(FINAL_GUESS_MARKER.lower())
-    guess_text = response_lower[start_index + len(FINAL_GUESS_MARKER):].strip()
-    guess_text = ''.join([ch for ch in guess_text if ch.isalpha() or ch.isspace()])
-
-    if start_index != -1:
-        # Extract the word immediately following the marker
-        potential_guess = guess_text.strip()
-        # Find the first 5-letter word in the remaining string
-        for word in potential_guess.split():
-            cleaned_word = ''.join([ch for ch in word if ch.isalpha()])
-            if is_valid_guess(cleaned_word):
-                return cleaned_word
+    # The first 5-letter word after the marker
+    marker = FINAL_GUESS_RE.search(llm_response)
+    if marker:
+        guess = WORD5_RE.search(llm_response, marker.end())
+        if guess:
+            return guess.group().lower()
     
     # Fallback: find the last valid 5-letter word in the entire response
-    response_no_punctuation_spaces_ok = ''.join([c for c in llm_response if c.isalpha() or c.isspace()]).lower()
-    all_words = [''.join(filter(str.isalpha, word)) for word in response_no_punctuation_spaces_ok.split()]
-    all_words = [word for word in all_words if len(word) == 5]
-    valid_guesses = [word for word in all_words if is_valid_guess(word)]
+    valid_guesses = WORD5_RE.findall(llm_response)
     if valid_guesses:
-        return valid_guesses[-1]
+        return valid_guesses[-1].lower()
         
     # Final fallback if no valid guess is found
     print("Warning: Oracle did not produce a valid 5-letter guess. Returning 'audio'.")
@@ -174,10 +312,103 @@ def extract_final_guess(llm_response: str) -> str:
                     "arise", "roast", "raise"]
     return random.choice(common_guesses)
 
-def generate_training_data(num_simulations: int):
+def write_examples(out: BinaryIO, training_examples: List[Dict[str, Any]]):
+    """Serialize training examples and append them to the dataset file as JSON lines."""
+    out.write(b"".join(dumps_example(example) + b"\n" for example in training_examples))
+    # Push each finished simulation to disk so an interrupted run keeps it
+    out.flush()
+
+async def run_simulation(
+    sim_index: int, num_simulations: int, out: BinaryIO, write_lock: asyncio.Lock, oracle_slots: asyncio.Semaphore
+) -> int:
+    """
+    Plays one set of 9 games, collecting a training example for every oracle
+    prompt, and appends them to the open dataset file `out` as one block when
+    the simulation ends. Returns the number of examples generated.
+    """
+    print(f"\n--- Running Simulation {sim_index+1}/{num_simulations} ---")
+    # Each simulation draws from its own generator, seeded per simulation when SEED is set
+    rng = random.Random(None if SEED is None else f"{SEED}-{sim_index}")
+    game_states = initialize_games(rng)
+    # (prompt, oracle response task) pairs, in the order the prompts were made
+    oracle_requests = []
+    guess_futures = []
+    
+    # We need a starting guess. Use a common one.
+    current_guesses = ["audio"] * len(game_states)
+    
+    try:
+        # The game loop now generates data at each step
+        for turn in range(MAX_GUESSES):
+            print(f"Simulation {sim_index+1}, Turn {turn + 1}: Guessing {', '.join(sorted(set(current_guesses)))}")
+        
+            # Apply the guesses to all non-completed games
+            for game, guess in zip(game_states, current_guesses):
+                apply_guess_to_game(guess, game)
+
+            # Stop as soon as every game is done; there is nothing left to ask the oracle
+            if all(g["done"] for g in game_states):
+                print(f"Simulation {sim_index+1}: All games finished. Ending simulation.")
+                break
+
+            # 1. Create the prompts based on the new game state
+            if PER_BOARD_PROMPTS:
+                open_games = [i for i, g in enumerate(game_states) if not g["done"]]
+                prompts = [create_single_board_prompt(game_states[i]) for i in open_games]
+            else:
+                prompts = [create_wordle_prompt(game_states)]
+        
+            # 2. Ask the "oracle" for the ideal responses, all prompts at once. Each guess
+            # resolves as soon as it streams in, so the next turn starts while the oracle
+            # is still finishing this turn's reasoning.
+            loop = asyncio.get_running_loop()
+            guess_futures = [loop.create_future() for _ in prompts]
+            for prompt, guess_future in zip(prompts, guess_futures):
+                oracle_requests.append((prompt, asyncio.create_task(get_oracle_response(prompt, oracle_slots, guess_future))))
+
+            # 3. Continue the simulation with the oracle's guesses
+            next_guesses = await asyncio.gather(*guess_futures)
+            if PER_BOARD_PROMPTS:
+                for i, guess in zip(open_games, next_guesses):
+                    current_guesses[i] = guess
+            else:
+                current_guesses = next_guesses * len(game_states)
+
+        # Wait for the full responses; the training examples need the whole text
+        oracle_full_responses = await asyncio.gather(*[task for _, task in oracle_requests])
+    finally:
+        # If the simulation fails or is cancelled, stop the responses still streaming
+        # and collect every outcome so no task or guess is left unobserved
+        for _, task in oracle_requests:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*[task for _, task in oracle_requests], *guess_futures, return_exceptions=True)
+
+    # 4. Create the training examples in ChatML format
+    training_examples = [
+        {
+            "messages": [
+                {"role": "user", "content": prompt},
+                {"role": "assistant", "content": oracle_full_response}
+            ]
+        }
+        for (prompt, _), oracle_full_response in zip(oracle_requests, oracle_full_responses)
+    ]
+
+    # Save this simulation's examples to the JSONL file as one contiguous block.
+    # Serializing and writing run in a worker thread, overlapping other simulations'
+    # oracle calls; the lock keeps simulations from writing at the same time.
+    async with write_lock:
+        await asyncio.to_thread(write_examples, out, training_examples)
+    return len(training_examples)
+
+async def generate_training_data(num_simulations: int):
     """
     Main function to run simulations and generate training data.
     `num_simulations` is the total number of 9-game sets to run.
+    Up to OLLAMA_NUM_PARALLEL simulations run concurrently, so the oracle's
+    latency overlaps across them while each one finishes (and is saved) soon
+    after it starts; oracle_slots keeps at most OLLAMA_NUM_PARALLEL requests in flight.
     """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     # OUTPUT_DATASET_FILE = "wordle_training_data.jsonl"
@@ -187,59 +418,31 @@ def generate_training_data(num_simulations: int):
     # make the "train" dir
     os.makedirs(ORACLE_TRAIN_FOLDER, exist_ok=True)
 
-    # Ensure the output directory exists
-    if not os.path.exists(filename):
-        with open(filename, 'w') as f:
-            pass # Create the file if it doesn't exist
+    # Created here rather than at import so they belong to this run's event loop
+    write_lock = asyncio.Lock()
+    oracle_slots = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
+    simulation_slots = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
 
-    total_examples = 0
-    for i in range(num_simulations):
-        print(f"\n--- Running Simulation {i+1}/{num_simulations} ---")
-        game_states = initialize_games()
-        
-        # We need a starting guess. Use a common one.
-        current_guess = "audio" 
-        
-        # The game loop now generates data at each step
-        for turn in range(MAX_GUESSES):
-            print(f"Turn {turn + 1}: Guessing '{current_guess}'")
-            
-            # Apply the guess to all non-completed games
-            for game in game_states:
-                 if not (game["guesses"] and game["guesses"][-1] == game["target_word"]):
-                    feedback = generate_feedback(current_guess, game["target_word"])
-                    game["guesses"].append(current_guess)
-                    game["feedback"].append(feedback)
-
-            # 1. Create the prompt based on the new game state
-            prompt = create_wordle_prompt(game_states)
-            
-            # 2. Get the ideal response from the "oracle"
-            oracle_full_response = get_oracle_response(prompt)
-            
-            # 3. Create the training example in ChatML format
-            training_example = {
-                "messages": [
-                    {"role": "user", "content": prompt},
-                    {"role": "assistant", "content": oracle_full_response}
-                ]
-            }
-            
-            # 4. Save the example to the JSONL file
-            with open(filename, 'a') as f:
-                f.write(json.dumps(training_example) + '\n')
-            total_examples += 1
-            
-            # 5. Extract the next guess from the oracle's response to continue the simulation
-            current_guess = extract_final_guess(oracle_full_response)
-            
-            # Check if all games are won
-            if all(g["guesses"] and g["guesses"][-1] == g["target_word"] for g in game_states):
-                print("All games won. Ending simulation early.")
-                break
+    async def run_one_simulation(i: int) -> int:
+        # Bound how many simulations hold unsaved examples in memory at once
+        async with simulation_slots:
+            return await run_simulation(i, num_simulations, out, write_lock, oracle_slots)
+
+    # Open the dataset once for the whole run; writes are buffered and each
+    # simulation's block is flushed as soon as it is written
+    with open(filename, 'ab', buffering=1 << 20) as out:
+        # A failed simulation must not stop the others from finishing and saving
+        results = await asyncio.gather(
+            *[run_one_simulation(i) for i in range(num_simulations)], return_exceptions=True
+        )
+    failures = [result for result in results if isinstance(result, BaseException)]
+    total_examples = sum(result for result in results if not isinstance(result, BaseException))
 
     print(f"\n--- Data Generation Complete ---")
     print(f"Generated {total_examples} training examples in '{filename}'.")
+    if failures:
+        print(f"{len(failures)} of {num_simulations} simulations failed.")
+        raise failures[0]
 
 
 if __name__ == "__main__":
@@ -247,4 +450,4 @@ if __name__ == "__main__":
     # For example, 100 simulations will play 900 games total.
     # Each turn of each simulation creates one training data point.
     NUMBER_OF_SIMULATIONS = 10
-    generate_training_data(NUMBER_OF_SIMULATIONS)
+    asyncio.run(generate_training_data(NUMBER_OF_SIMULATIONS))